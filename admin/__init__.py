@@ -0,0 +1 @@
+"""管理员客户端"""
@@ -2,17 +2,25 @@
 import sys
 from typing import Any, Dict, List
 
-sys.path.append('.')
-sys.path.append('..')
-
 import qasync
 
-import mainwindow
 import api
+from admin import mainwindow
 
-from PySide6.QtWidgets import QTableWidgetItem
+from table import fill_table
 from toast import QToaster
 
+# 各表格按列顺序排列的记录字段名
+_PILE_STAT_COLS = ('pile_id', 'status', 'cumulative_usage_times', 'cumulative_charging_time',
+                   'cumulative_charging_amount')
+_REPORT_COLS = ('pile_id', 'day', 'week', 'month', 'cumulative_usage_times', 'cumulative_charging_time',
+                'cumulative_charging_amount', 'cumulative_charging_earning', 'cumulative_service_earning',
+                'cumulative_earning')
+_QUEUE_COLS = ('pile_id', 'username', 'battery_size', 'require_amount', 'waiting_time')
+
+# 充电桩状态选项 -> 提交给服务端的状态代码，其余选项视为 UNAVAILABLE
+_PILE_STATUS = {'运行': 'RUNNING', '关机': 'SHUTDOWN'}
+
 
 # TODO 仿照该函数编写其它点击事件函数
 @qasync.asyncSlot()
@@ -25,7 +33,7 @@ async def on_login_clicked():
     if is_admin == 'USER':
         QToaster.showMessage(window.window, "权限不足 无法登陆")
         return
-    api.TOKEN = token
+    api.set_token(token)
     if is_admin:
         role = 'ADMIN'
     else:
@@ -48,14 +56,7 @@ async def on_query_piles_stat_clicked() -> List[Dict[str, Any]]:
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
         return
-    window.query_pile_state_table.clearContents()
-    for i in range(0, len(data)):
-        window.query_pile_state_table.setRowCount(i + 1)
-        window.query_pile_state_table.setItem(i, 0, QTableWidgetItem(data[i]['pile_id']))
-        window.query_pile_state_table.setItem(i, 1, QTableWidgetItem(data[i]['status']))
-        window.query_pile_state_table.setItem(i, 2, QTableWidgetItem(str(data[i]['cumulative_usage_times'])))
-        window.query_pile_state_table.setItem(i, 3, QTableWidgetItem(str(data[i]['cumulative_charging_time'])))
-        window.query_pile_state_table.setItem(i, 4, QTableWidgetItem(str(data[i]['cumulative_charging_amount'])))
+    fill_table(window.query_pile_state_table, data, _PILE_STAT_COLS)
     QToaster.showMessage(window.window, "查询成功")
 
 
@@ -66,19 +67,7 @@ async def on_check_pile_list_clicked():
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
         return
-    window.query_pile_list_table.clearContents()
-    for i in range(0, len(data)):
-        window.query_pile_list_table.setRowCount(i + 1)
-        window.query_pile_list_table.setItem(i, 0, QTableWidgetItem(str(data[i]['pile_id'])))
-        window.query_pile_list_table.setItem(i, 1, QTableWidgetItem(str(data[i]['day'])))
-        window.query_pile_list_table.setItem(i, 2, QTableWidgetItem(str(data[i]['week'])))
-        window.query_pile_list_table.setItem(i, 3, QTableWidgetItem(str(data[i]['month'])))
-        window.query_pile_list_table.setItem(i, 4, QTableWidgetItem(str(data[i]['cumulative_usage_times'])))
-        window.query_pile_list_table.setItem(i, 5, QTableWidgetItem(str(data[i]['cumulative_charging_time'])))
-        window.query_pile_list_table.setItem(i, 6, QTableWidgetItem(str(data[i]['cumulative_charging_amount'])))
-        window.query_pile_list_table.setItem(i, 7, QTableWidgetItem(str(data[i]['cumulative_charging_earning'])))
-        window.query_pile_list_table.setItem(i, 8, QTableWidgetItem(str(data[i]['cumulative_service_earning'])))
-        window.query_pile_list_table.setItem(i, 9, QTableWidgetItem(str(data[i]['cumulative_earning'])))
+    fill_table(window.query_pile_list_table, data, _REPORT_COLS)
     QToaster.showMessage(window.window, "已显示报表结果")
 
 
@@ -89,14 +78,7 @@ async def on_check_queue_clicked():
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
         return
-    window.query_queue_table.clearContents()
-    for i in range(0, len(data)):
-        window.query_queue_table.setRowCount(i + 1)
-        window.query_queue_table.setItem(i, 0, QTableWidgetItem(str(data[i]['pile_id'])))
-        window.query_queue_table.setItem(i, 1, QTableWidgetItem(str(data[i]['username'])))
-        window.query_queue_table.setItem(i, 2, QTableWidgetItem(str(data[i]['battery_size'])))
-        window.query_queue_table.setItem(i, 3, QTableWidgetItem(str(data[i]['require_amount'])))
-        window.query_queue_table.setItem(i, 4, QTableWidgetItem(str(data[i]['waiting_time'])))
+    fill_table(window.query_queue_table, data, _QUEUE_COLS)
     QToaster.showMessage(window.window, "已显示队列结果")
 
 
@@ -104,13 +86,7 @@ async def on_check_queue_clicked():
 async def on_update_pile_stat():
     try:
         pile_id = window.pile_number_input.text()
-        status_text = window.pile_state_box.currentText()
-        if status_text == '运行':
-            status = 'RUNNING'
-        elif status_text == '关机':
-            status = 'SHUTDOWN'
-        else:
-            status = 'UNAVAILABLE'
+        status = _PILE_STATUS.get(window.pile_state_box.currentText(), 'UNAVAILABLE')
         await api.update_pile_stat(pile_id, status)
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
@@ -127,4 +103,4 @@ if __name__ == "__main__":
     window.query_pile_list_button.clicked.connect(on_check_pile_list_clicked)
     window.query_queue_button.clicked.connect(on_check_queue_clicked)
     window.update_button.clicked.connect(on_update_pile_stat)
-    sys.exit(mainwindow.run_mainwindow())
+    sys.exit(mainwindow.run_mainwindow(api.close))
@@ -1,6 +1,8 @@
 """主窗口"""
+import os
 import sys
 import asyncio
+from typing import Awaitable, Callable
 
 from qasync import QEventLoop
 
@@ -53,7 +55,7 @@ def create_window() -> MainWindow:
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
 
-    ui_file = QFile("./mainwindow.ui")
+    ui_file = QFile(os.path.join(os.path.dirname(__file__), "mainwindow.ui"))
     if not ui_file.open(QIODevice.ReadOnly):
         print(f"Cannot open ui file: {ui_file.errorString()}")
         sys.exit(-1)
@@ -69,9 +71,12 @@ def create_window() -> MainWindow:
     return mainwindow
 
 
-def run_mainwindow() -> int:
+def run_mainwindow(on_exit: Callable[[], Awaitable[None]] | None = None) -> int:
     """运行主窗体直到主窗体被关闭
 
+    Args:
+        on_exit (Callable[[], Awaitable[None]] | None): 事件循环结束后执行的清理协程，如关闭网络连接
+
     Returns:
         int: 执行返回值
     """
@@ -79,4 +84,7 @@ def run_mainwindow() -> int:
     mainwindow.window.show()
 
     with mainwindow.loop:
-        return mainwindow.loop.run_forever()
+        ret = mainwindow.loop.run_forever()
+        if on_exit is not None:
+            mainwindow.loop.run_until_complete(on_exit())
+        return ret
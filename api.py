@@ -1,13 +1,22 @@
 """API封装"""
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Tuple, Type
 
-import requests
+import httpx
+from httpx import ConnectError, ConnectTimeout, HTTPError, ReadTimeout
+import orjson
 
 # BASE_URL = 'https://acss.jnn.icu/api'  # 基础 API URL (停止维护)
 BASE_URL = 'http://127.0.0.1:8000'  # 本地测试 URL
 TOKEN = ''
 
+# 复用的异步 HTTP 客户端，保持长连接，避免每次请求重新握手
+_client = httpx.AsyncClient(
+    base_url=BASE_URL,
+    http2=True,
+    timeout=httpx.Timeout(10.0),
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+)
+
 
 class ApiError(BaseException):
     """API返回值为-1时抛出该异常
@@ -31,42 +40,111 @@ class ApiError(BaseException):
     """
 
 
-async def api_post(path: str, json: Dict) -> Dict[str, Any] | None:
-    """POST 请求封装
+# orjson 编码请求体时需要手动声明的请求头
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# 支持条件请求的 GET 接口，缓存 ETag 与对应的解析结果，304 时直接复用
+_ETAG_PATHS = frozenset(('/admin/query_all_piles_stat', '/time'))
+_etag_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+# 网络异常类型到错误信息的映射，按异常类的 MRO 查找最接近的类型
+_ERRMAP: Dict[type, str] = {
+    ConnectTimeout: '连接超时',
+    ConnectError: '连接错误',
+    ReadTimeout: '数据读取超时',
+    HTTPError: 'Http错误',
+}
+_NETWORK_ERRORS: Tuple[Type[BaseException], ...] = tuple(_ERRMAP)
+
+
+def set_token(token: str) -> None:
+    """设置登录凭据并更新客户端的鉴权请求头
+
+    请求头只在登录与注销时写入客户端的默认请求头中，单次请求不再重复构造。
+
+    Args:
+        token (str): 登录获得的 token，传入空字符串表示注销
+    """
+    global TOKEN
+    TOKEN = token
+    _etag_cache.clear()
+    if token:
+        _client.headers['Authorization'] = f'Bearer {token}'
+    else:
+        _client.headers.pop('Authorization', None)
+
+
+async def close() -> None:
+    """关闭复用的 HTTP 客户端，程序退出前调用"""
+    await _client.aclose()
+
+
+def _chained(err: ApiError, cause: BaseException) -> ApiError:
+    """显式设置异常原因，等价于 `raise err from cause`
+
+    mypyc 编译后 `raise ... from ...` 不会设置 __cause__，这里手动设置以保留异常链。
+    """
+    err.__cause__ = cause
+    return err
+
+
+async def _request(method: str, path: str, json: Dict | None = None) -> Any:
+    """请求封装，自动添加鉴权请求头并检查响应码
 
     Args:
+        method (str): HTTP 方法，如 GET、POST
         path (str): BASE_URL 后的相对路径
-        json (Dict): 字典，会被转换为JSON字符串置于请求体中
+        json (Dict | None): 字典，会被转换为JSON字符串置于请求体中
 
     Raises:
-        ApiError: 响应码为-1的异常，包含错误信息
+        ApiError: 网络异常或响应码为-1的异常，包含错误信息
 
     Returns:
-        Dict[str, Any] | None: 响应中的 data 字段，可能为 None
+        Any: 响应中的 data 字段，可能为 None
     """
-    url = BASE_URL + path
+    conditional = method == 'GET' and path in _ETAG_PATHS
+    cached = _etag_cache.get(path) if conditional else None
+    resp: Dict[str, Any]
     try:
-        if len(TOKEN) > 0:
-            header = {'Authorization': f'Bearer {TOKEN}'}
-            resp: dict = requests.post(url=url, json=json, headers=header).json()
+        if json is not None:
+            response = await _client.request(method, path, content=orjson.dumps(json), headers=_JSON_HEADERS)
         else:
-            resp: dict = requests.post(url=url, json=json).json()
-    except requests.exceptions.ConnectTimeout as e:
-        raise ApiError('连接超时') from e
-    except requests.exceptions.ConnectionError as e:
-        raise ApiError('连接错误') from e
-    except requests.exceptions.ReadTimeout as e:
-        raise ApiError('数据读取超时') from e
-    except requests.exceptions.HTTPError as e:
-        raise ApiError('Http错误') from e
-    except BaseException as e:
-        raise ApiError('网络错误') from e
+            response = await _client.request(method, path,
+                                             headers={'If-None-Match': cached[0]} if cached else None)
+        if cached and response.status_code == 304:
+            resp = cached[1]
+        else:
+            resp = orjson.loads(response.content)
+            etag = response.headers.get('ETag')
+            if conditional and etag:
+                _etag_cache[path] = (etag, resp)
+    except _NETWORK_ERRORS as e:
+        message = next(_ERRMAP[cls] for cls in type(e).__mro__ if cls in _ERRMAP)
+        raise _chained(ApiError(message), e)
+    except Exception as e:
+        raise _chained(ApiError('网络错误'), e)
     if resp['code'] == -1:
         raise ApiError(resp['message'])
     return resp.get('data')
 
 
-async def api_get(path: str) -> Dict[str, Any] | None:
+async def api_post(path: str, json: Dict) -> Any:
+    """POST 请求封装
+
+    Args:
+        path (str): BASE_URL 后的相对路径
+        json (Dict): 字典，会被转换为JSON字符串置于请求体中
+
+    Raises:
+        ApiError: 响应码为-1的异常，包含错误信息
+
+    Returns:
+        Any: 响应中的 data 字段，可能为 None
+    """
+    return await _request('POST', path, json)
+
+
+async def api_get(path: str) -> Any:
     """GET 请求封装
 
     Args:
@@ -76,36 +154,17 @@ async def api_get(path: str) -> Dict[str, Any] | None:
         ApiError: 响应码为-1的异常，包含错误信息
 
     Returns:
-        Dict[str, Any] | None: 响应中的 data 字段，可能为 None
+        Any: 响应中的 data 字段，可能为 None
     """
-    url = BASE_URL + path
-    try:
-        if len(TOKEN) > 0:
-            header = {'Authorization': f'Bearer {TOKEN}'}
-            resp: dict = requests.get(url=url, headers=header).json()
-        else:
-            resp: dict = requests.get(url=url).json()
-    except requests.exceptions.ConnectTimeout as e:
-        raise ApiError('连接超时') from e
-    except requests.exceptions.ConnectionError as e:
-        raise ApiError('连接错误') from e
-    except requests.exceptions.ReadTimeout as e:
-        raise ApiError('数据读取超时') from e
-    except requests.exceptions.HTTPError as e:
-        raise ApiError('Http错误') from e
-    except BaseException as e:
-        raise ApiError('网络错误') from e
-    if resp['code'] == -1:
-        raise ApiError(resp['message'])
-    return resp.get('data')
+    return await _request('GET', path)
 
 
-async def login(username: str, password: str) -> Dict[str, Any]:
+async def login(username: str, password: str) -> Tuple[str, Any]:
     data = await api_post('/login', json={'username': username, 'password': password})
     return data['token'], data['is_admin']
 
 
-async def time() -> Tuple[datetime, int]:
+async def time() -> Tuple[str, float]:
     data = await api_get('/time')
     return data['datetime'], data['timestamp']
 
@@ -156,7 +215,7 @@ async def preview_queue() -> Dict[str, Any]:
     return data
 
 
-async def query_all_piles_stat() -> Dict[str, Any]:
+async def query_all_piles_stat() -> List[Dict[str, Any]]:
     data = await api_get('/admin/query_all_piles_stat')
     return data
 
@@ -172,8 +231,7 @@ async def admin_query_queue() -> List[Dict[str, Any]]:
 
 
 async def update_pile_stat(pile_id: str, status: str) -> None:
-    data = await api_post('/admin/update_pile', json={
+    await api_post('/admin/update_pile', json={
         'pile_id': pile_id,
         'status': status
     })
-    return data
@@ -0,0 +1,13 @@
+"""将 api.py 用 mypyc 编译为 C 扩展（可选）
+
+在项目根目录执行 `python3.10 setup.py build_ext --inplace` 后，
+api 模块会优先加载编译出的扩展；删除生成的 .so/.pyd 文件即可恢复纯 Python 版本。
+"""
+from setuptools import setup
+
+from mypyc.build import mypycify
+
+setup(
+    name='acss-frontend',
+    ext_modules=mypycify(['api.py']),
+)
@@ -0,0 +1,38 @@
+"""表格工具，用户与管理员客户端共用"""
+from typing import Any, Dict, List, Tuple
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QTableWidget, QTableWidgetItem
+
+
+def fill_table(table: QTableWidget, data: List[Dict[str, Any]], cols: Tuple[str, ...],
+               row_key: str | None = None) -> None:
+    """一次性填充表格
+
+    先设定总行数并暂停重绘，逐格写入后统一刷新，避免逐行扩表引起的反复重排。
+    已存在的单元格对象会被复用，仅修改文本，不再每次刷新都重新创建。
+
+    Args:
+        table (QTableWidget): 待填充的表格
+        data (List[Dict[str, Any]]): 每行一条记录
+        cols (Tuple[str, ...]): 按列顺序排列的记录字段名
+        row_key (str | None): 写入每行首个单元格 Qt.UserRole 数据的字段名，未指定时清空该数据
+    """
+    sorting = table.isSortingEnabled()
+    table.setUpdatesEnabled(False)
+    table.setSortingEnabled(False)
+    try:
+        table.setRowCount(len(data))
+        width = table.columnCount()
+        for i, row in enumerate(data):
+            for j in range(width):
+                text = str(row[cols[j]]) if j < len(cols) else ''
+                item = table.item(i, j)
+                if item is None:
+                    table.setItem(i, j, QTableWidgetItem(text))
+                else:
+                    item.setText(text)
+            table.item(i, 0).setData(Qt.UserRole, row[row_key] if row_key else None)
+    finally:
+        table.setSortingEnabled(sorting)
+        table.setUpdatesEnabled(True)
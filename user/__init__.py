@@ -0,0 +1 @@
+"""用户客户端"""
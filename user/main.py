@@ -2,17 +2,16 @@
 import sys
 import asyncio
 import datetime
-
-sys.path.append('..')
+import time
 
 import qasync
 
-import mainwindow
 import api
+from user import mainwindow
 
+from table import fill_table
 from toast import QToaster
-from PySide6.QtWidgets import QTableWidgetItem
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import Qt, QTimer
 
 
 # TODO 仿照该函数编写其它点击事件函数
@@ -29,7 +28,8 @@ async def on_login_clicked():
         return
     else:
         role = 'USER'
-    api.TOKEN = token
+    api.set_token(token)
+    _start_preview()
     window.user_role_label.setText(role)
     window.user_state_label.setText('已登陆')
     QToaster.showMessage(window.window, "登陆成功")
@@ -47,7 +47,9 @@ async def on_register_clicked():
 
 @qasync.asyncSlot()
 async def on_logout_clicked():
-    api.TOKEN = ''
+    global server_time
+    api.set_token('')
+    server_time = None
     window.user_role_label.setText('无')
     window.user_state_label.setText('未登陆')
     QToaster.showMessage(window.window, "成功注销")
@@ -62,68 +64,101 @@ async def on_checklist_clicked():
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
         return
-    window.bill_table.clearContents()
-    for i in range(0, len(data)):
-        window.bill_table.setRowCount(i + 1)
-        window.bill_table.setItem(i, 0, QTableWidgetItem(data[i]['bill_id']))
-        window.bill_table.setItem(i, 1, QTableWidgetItem(data[i]['create_time']))
-        window.bill_table.setItem(i, 2, QTableWidgetItem(data[i]['pile_id']))
-        window.bill_table.setItem(i, 3, QTableWidgetItem(str(data[i]['charged_amount'])))
-        window.bill_table.setItem(i, 4, QTableWidgetItem(str(data[i]['charged_time'])))
-        window.bill_table.setItem(i, 5, QTableWidgetItem(data[i]['begin_time']))
-        window.bill_table.setItem(i, 6, QTableWidgetItem(data[i]['end_time']))
-        window.bill_table.setItem(i, 7, QTableWidgetItem(data[i]['charging_cost']))
-        window.bill_table.setItem(i, 8, QTableWidgetItem(str(data[i]['service_cost'])))
-        window.bill_table.setItem(i, 9, QTableWidgetItem(str(data[i]['total_cost'])))
+    fill_table(window.bill_table, data, _BILL_COLS, row_key='bill_id')
     QToaster.showMessage(window.window, "查询成功")
 
 
 last_state = 0
 
+PREVIEW_INTERVAL = 1000  # 排队预览刷新间隔(ms)
+PREVIEW_MAX_INTERVAL = 16000  # 请求失败退避后的最大刷新间隔(ms)
+preview_interval = PREVIEW_INTERVAL
+preview_running = False  # 是否已有刷新在进行或已预约，保证同时只有一条刷新链
+
+TIME_SYNC_INTERVAL = 300  # 与服务端校准时间的间隔(s)
+server_time: str | None = None  # 上次校准时服务端返回的时间字符串，None 表示尚未校准
+server_datetime: datetime.datetime | None = None  # server_time 解析后的时间，无法解析时为 None
+time_synced_at = 0.0  # 上次校准时的本地单调时钟
 
 
 @qasync.asyncSlot()
 async def on_what_clicked():
     # 函数名自己看着办
+    # 界面上没有单独的账单号输入框，取账单表格中当前选中行保存的账单号
+    # 账单与详单共用同一表格，显示详单时行内不保存账单号
+    bill_item = window.bill_table.item(window.bill_table.currentRow(), 0)
+    bill_id = bill_item.data(Qt.UserRole) if bill_item is not None else None
+    if bill_id is None:
+        QToaster.showMessage(window.window, "请先选择账单")
+        return
     try:
-        data = api.query_order_detail()
+        data = await api.query_order_detail(str(bill_id))
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
         return
 
-    window.query_order_table.clearContents()
-    for i in range(0, len(data)):
-        window.query_order_table.setRowCount(i + 1)
-        window.query_order_table.setItem(i, 0, QTableWidgetItem(data[i]['car_id']))
-        window.query_order_table.setItem(i, 1, QTableWidgetItem(data[i]['data']))
-        window.query_order_table.setItem(i, 2, QTableWidgetItem(data[i]['Bill_id']))
-        window.query_order_table.setItem(i, 3, QTableWidgetItem(data[i]['chargedPileNum']))
-        window.query_order_table.setItem(i, 4, QTableWidgetItem(str(data[i]['chargedAamount'])))
-        window.query_order_table.setItem(i, 5, QTableWidgetItem(str(data[i]['chargedDuration'])))
-        window.query_order_table.setItem(i, 6, QTableWidgetItem(data[i]['StartTime']))
-        window.query_order_table.setItem(i, 7, QTableWidgetItem(data[i]['EndTime']))
-        window.query_order_table.setItem(i, 8, QTableWidgetItem(str(data[i]['ChargeFee'])))
-        window.query_order_table.setItem(i, 9, QTableWidgetItem(str(data[i]['ServiceFee'])))
-        window.query_order_table.setItem(i, 10, QTableWidgetItem(str(data[i]['subtotalFee'])))
+    fill_table(window.query_order_table, data, _ORDER_COLS)
     QToaster.showMessage(window.window, "查询成功")
 
 
 
-@qasync.asyncSlot()
-async def preview_callback():
+def _on_not_charging():
     global last_state
-    if len(api.TOKEN) == 0:
-        return
+    if last_state == 1:
+        QToaster.showMessage(window.window, "充电结束 请查询详单")
+        last_state = 0
+
+
+def _on_charging():
+    global last_state
+    last_state = 1
+
+
+# 账单与详单表格按列顺序排列的记录字段名
+_BILL_COLS = ('bill_id', 'create_time', 'pile_id', 'charged_amount', 'charged_time',
+              'begin_time', 'end_time', 'charging_cost', 'service_cost', 'total_cost')
+_ORDER_COLS = ('car_id', 'data', 'Bill_id', 'chargedPileNum', 'chargedAamount', 'chargedDuration',
+               'StartTime', 'EndTime', 'ChargeFee', 'ServiceFee', 'subtotalFee')
+
+# 充电状态 -> (状态标签文本, 进入该状态时的附加处理)
+_STATE_TABLE = {
+    'NOTCHARGING': ('没有充电请求', _on_not_charging),
+    'WAITINGSTAGE1': ('在等候区等待', None),
+    'WAITINGSTAGE2': ('在充电区等待', None),
+    'CHARGING': ('正在充电', _on_charging),
+    'CHANGEMODEREQUEUE': ('充电模式更改 重新排队', None),
+    'FAULTREQUEUE': ('充电桩故障', None),
+}
+
+
+async def _sync_time():
+    global server_time, server_datetime, time_synced_at
+    now_time, _ = await api.time()
     try:
+        server_datetime = datetime.datetime.fromisoformat(now_time)
+    except (TypeError, ValueError):
+        server_datetime = None
+    time_synced_at = time.monotonic()
+    server_time = now_time
+
+
+async def _update_preview():
+    # 时间由本地单调时钟推算，仅在未校准或超过校准间隔时才向服务端请求
+    if server_time is None or time.monotonic() - time_synced_at > TIME_SYNC_INTERVAL:
+        # 两个请求互不依赖，并发发出
+        data, synced = await asyncio.gather(api.preview_queue(), _sync_time(), return_exceptions=True)
+        for result in (data, synced):
+            if isinstance(result, BaseException):
+                raise result
+    else:
         data = await api.preview_queue()
-    except api.ApiError as e:
-        QToaster.showMessage(window.window, str(e))
-        return
-    try:
-        now_time = await api.time()
-    except api.ApiError as e:
-        QToaster.showMessage(window.window, str(e))
+    # 等待期间可能已注销，校准结果被清空时放弃本次刷新
+    now_time, synced_datetime = server_time, server_datetime
+    if now_time is None or not api.TOKEN:
         return
+    if synced_datetime is not None:
+        elapsed = datetime.timedelta(seconds=time.monotonic() - time_synced_at)
+        now_time = (synced_datetime + elapsed).isoformat(sep=' ', timespec='seconds')
     # 排队长度
     if data['queue_len'] != -1:
         window.queue_position_label.setText(f"前有{data['queue_len']}人")
@@ -133,35 +168,52 @@ async def preview_callback():
     if data['charge_id']:
         window.request_id_label.setText(data['charge_id'])
     # 时间
-    window.time_label.setText(now_time[0])
+    window.time_label.setText(now_time)
     # 状态
-    if data['cur_state'] == 'NOTCHARGING':
-        window.status_label.setText('没有充电请求')
-        if last_state == 1:
-            QToaster.showMessage(window.window, "充电结束 请查询详单")
-            last_state = 0
-    elif data['cur_state'] == 'WAITINGSTAGE1':
-        window.status_label.setText('在等候区等待')
-    elif data['cur_state'] == 'WAITINGSTAGE2':
-        window.status_label.setText('在充电区等待')
-    elif data['cur_state'] == 'CHARGING':
-        window.status_label.setText('正在充电')
-        last_state = 1
-    elif data['cur_state'] == 'CHANGEMODEREQUEUE':
-        window.status_label.setText('充电模式更改 重新排队')
-    elif data['cur_state'] == 'FAULTREQUEUE':
-        window.status_label.setText('充电桩故障')
+    label, on_state = _STATE_TABLE.get(data['cur_state'], (None, None))
+    if label:
+        window.status_label.setText(label)
+    if on_state:
+        on_state()
+
+
+def _start_preview():
+    """登录后开始刷新排队预览，已在刷新时不重复启动"""
+    global preview_running, preview_interval
+    if preview_running:
+        return
+    preview_running = True
+    preview_interval = PREVIEW_INTERVAL
+    QTimer.singleShot(PREVIEW_INTERVAL, preview_callback)
 
 
 @qasync.asyncSlot()
-async def on_submit_clicked():
+async def preview_callback():
+    """刷新排队预览，完成后再预约下一次刷新
+
+    上一次刷新结束才开始计时，网络较慢时不会堆积请求；
+    请求失败时刷新间隔加倍直至上限，成功后恢复。
+    注销后不再预约，直到下次登录由 _start_preview 重新启动。
+    """
+    global preview_interval, preview_running
     try:
-        mode_text = window.charge_mode_box.currentText()
-        if mode_text == '快充':
-            mode = 'F'
+        if api.TOKEN:
+            await _update_preview()
+        preview_interval = PREVIEW_INTERVAL
+    except api.ApiError as e:
+        QToaster.showMessage(window.window, str(e))
+        preview_interval = min(preview_interval * 2, PREVIEW_MAX_INTERVAL)
+    finally:
+        if api.TOKEN:
+            QTimer.singleShot(preview_interval, preview_callback)
         else:
-            mode = 'T'
-        await api.submit_charging_request(mode, window.require_amount_input.text(),
+            preview_running = False
+
+
+@qasync.asyncSlot()
+async def on_submit_clicked():
+    try:
+        await api.submit_charging_request(window.charge_mode_box.currentData(), window.require_amount_input.text(),
                                           window.battery_capacity_input.text())
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
@@ -172,12 +224,7 @@ async def on_submit_clicked():
 @qasync.asyncSlot()
 async def on_edit_request_clicked():
     try:
-        mode_text = window.charge_mode_box.currentText()
-        if mode_text == '快充':
-            mode = 'F'
-        else:
-            mode = 'T'
-        await api.edit_charging_request(mode, window.require_amount_input.text())
+        await api.edit_charging_request(window.charge_mode_box.currentData(), window.require_amount_input.text())
     except api.ApiError as e:
         QToaster.showMessage(window.window, str(e))
         return
@@ -204,7 +251,4 @@ if __name__ == "__main__":
     window.edit_request_button.clicked.connect(on_edit_request_clicked)
     window.end_request_button.clicked.connect(on_end_request_clicked)
     # TODO 在这里注册其它按钮的slot函数
-    timer = QTimer()
-    timer.timeout.connect(preview_callback)
-    timer.start(1000)
-    sys.exit(mainwindow.run_mainwindow())
+    sys.exit(mainwindow.run_mainwindow(api.close))